@@ -16,6 +16,9 @@ Usage:
     # Output to stdout only (for CI piping)
     python3 commit-context-generator.py --base $BASE --head $HEAD --stdout
 
+    # Line counts only, skipping pattern detection (for very large diffs)
+    python3 commit-context-generator.py --base $BASE --head $HEAD --fast
+
 Output:
 - Prints context summary to stdout
 - Saves full context to .claude/artifacts/commit-context.md (unless --stdout)
@@ -24,12 +27,16 @@ Output:
 from __future__ import annotations  # Enable PEP 604 syntax on Python 3.7+
 
 import argparse
+import functools
+import io
 import json
 import re
 import subprocess
 import sys
+from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
+from typing import Iterable, Iterator
 
 
 def run_git(args: list[str]) -> str:
@@ -42,74 +49,120 @@ def run_git(args: list[str]) -> str:
     return result.stdout.strip()
 
 
-def get_full_diff(base: str | None = None, head: str | None = None) -> str:
-    """Get the full diff output.
+def get_numstat(
+    base: str | None = None, head: str | None = None
+) -> dict[str, tuple[int, int]]:
+    """Get per-file (additions, deletions) from git diff --numstat.
 
-    If base/head provided, compare those refs.
-    Otherwise, use staged changes.
-    Uses explicit noprefix=false to ensure consistent a/ b/ prefixes.
+    Uses -z so renamed paths arrive as separate NUL-terminated fields
+    instead of git's "old => new" display form. Binary files, which
+    numstat reports as "-", count as zero lines.
     """
     if base and head:
-        return run_git(["-c", "diff.noprefix=false", "diff", f"{base}...{head}"])
+        output = run_git(
+            ["diff", "--numstat", "-z", "--diff-filter=ACMRD", f"{base}...{head}"]
+        )
     else:
-        return run_git(["-c", "diff.noprefix=false", "diff", "--cached"])
+        output = run_git(["diff", "--cached", "--numstat", "-z", "--diff-filter=ACMRD"])
+
+    stats: dict[str, tuple[int, int]] = {}
+    fields = output.split("\0")
+    i = 0
+    while i < len(fields):
+        record = fields[i]
+        i += 1
+        if not record:
+            continue
+        adds, dels, path = record.split("\t", 2)
+        if not path:
+            # Rename/copy: the old and new paths follow as separate fields
+            path = fields[i + 1]
+            i += 2
+        stats[path] = (
+            int(adds) if adds.isdigit() else 0,
+            int(dels) if dels.isdigit() else 0,
+        )
+    return stats
 
 
-def get_changed_files(base: str | None = None, head: str | None = None) -> list[str]:
-    """Get list of changed files.
+def iter_file_diffs(
+    base: str | None = None, head: str | None = None
+) -> Iterator[tuple[str, list[str]]]:
+    """Stream the diff from git and yield (filepath, lines) per file.
 
     If base/head provided, compare those refs.
     Otherwise, use staged changes.
+    Uses explicit noprefix=false to ensure consistent a/ b/ prefixes,
+    and quotePath=false so non-ASCII paths match --numstat -z output.
+
+    git's stdout is read line by line, so only the diff of the file
+    currently being parsed is held in memory.
     """
+    args = ["git", "-c", "diff.noprefix=false", "-c", "core.quotePath=false", "diff"]
     if base and head:
-        output = run_git(
-            ["diff", "--name-only", "--diff-filter=ACMRD", f"{base}...{head}"]
-        )
+        args += ["--diff-filter=ACMRD", f"{base}...{head}"]
     else:
-        output = run_git(["diff", "--cached", "--name-only", "--diff-filter=ACMRD"])
-    return [f for f in output.split("\n") if f]
+        args += ["--cached", "--diff-filter=ACMRD"]
 
+    with subprocess.Popen(
+        args,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        bufsize=1 << 16,
+    ) as proc:
+        yield from _split_file_diffs(proc.stdout)
+
+
+# Pattern to match diff headers
+# Handles: diff --git a/path/file b/path/file
+# Also handles renames: diff --git a/old/path b/new/path
+# Also handles quoted paths: diff --git "a/path\twith\ttabs" "b/path\twith\ttabs"
+# Each side is matched as either a quoted or a bare path, so a quote can
+# never be split between the old and new names.
+_DIFF_HEADER_RE = re.compile(
+    r"^diff --git "
+    r'(?:"a/(?P<oldq>(?:[^"\\]|\\.)+)"|a/(?P<old>.+?)) '
+    r'(?:"b/(?P<newq>(?:[^"\\]|\\.)+)"|b/(?P<new>.+))$'
+)
 
-def parse_diff_by_file(full_diff: str) -> dict[str, str]:
-    """Parse a unified diff into per-file diffs.
 
-    Returns a dict mapping filepath to its diff content.
+def _split_file_diffs(lines: Iterable[str]) -> Iterator[tuple[str, list[str]]]:
+    """Split a unified diff into per-file chunks.
+
     Handles both regular files and renamed files.
     Also handles quoted filenames (for paths with spaces or special chars).
     """
-    if not full_diff.strip():
-        return {}
-
-    file_diffs: dict[str, str] = {}
     current_file: str | None = None
     current_diff_lines: list[str] = []
 
-    # Pattern to match diff headers
-    # Handles: diff --git a/path/file b/path/file
-    # Also handles renames: diff --git a/old/path b/new/path
-    # Also handles quoted paths: diff --git "a/path with spaces" "b/path with spaces"
-    diff_header_pattern = re.compile(r'^diff --git "?a/(.+?)"? "?b/(.+?)"?$')
-
-    for line in full_diff.split("\n"):
-        match = diff_header_pattern.match(line)
+    for line in lines:
+        match = _DIFF_HEADER_RE.match(line)
         if match:
-            # Save previous file's diff
+            # Emit previous file's diff
             if current_file and current_diff_lines:
-                file_diffs[current_file] = "\n".join(current_diff_lines)
+                yield current_file, current_diff_lines
 
             # Start new file - use the 'b' path (destination) for renames
-            current_file = match.group(2)
+            current_file = match.group("newq") or match.group("new")
             current_diff_lines = [line]
         elif current_file is not None:
             current_diff_lines.append(line)
 
-    # Save last file's diff
+    # Emit last file's diff
     if current_file and current_diff_lines:
-        file_diffs[current_file] = "\n".join(current_diff_lines)
+        yield current_file, current_diff_lines
+
+
+# Diffs with more changed lines than this stop content streaming and
+# pattern detection, and take their line counts from --numstat instead.
+FAST_PATH_LINE_THRESHOLD = 100_000
 
-    return file_diffs
+_TEST_DIRS = frozenset({"tests", "test", "__tests__"})
+_TEST_SUFFIXES = ("_test.py", ".test.ts", ".test.js", ".spec.ts", ".spec.js")
 
 
+@functools.lru_cache(maxsize=4096)
 def categorize_file(filepath: str) -> str:
     """Categorize a file based on its path and extension."""
     path = Path(filepath)
@@ -129,15 +182,9 @@ def categorize_file(filepath: str) -> str:
 
     # Test detection - check directory names and file prefixes/suffixes
     if (
-        "tests" in parts
-        or "test" in parts
-        or "__tests__" in parts
+        not _TEST_DIRS.isdisjoint(parts)
         or name.startswith("test_")
-        or name.endswith("_test.py")
-        or name.endswith(".test.ts")
-        or name.endswith(".test.js")
-        or name.endswith(".spec.ts")
-        or name.endswith(".spec.js")
+        or name.endswith(_TEST_SUFFIXES)
     ):
         return "tests"
 
@@ -181,71 +228,103 @@ def categorize_file(filepath: str) -> str:
     return ext_categories.get(ext, "other")
 
 
-def analyze_diff(diff: str) -> dict:
-    """Analyze a diff to understand what changed.
-
-    Performs a single pass over the diff lines to calculate stats
-    and detect patterns simultaneously.
+# Detected patterns, stored per file as an int bitfield
+PAT_NEW_FUNCTION = 1 << 0
+PAT_NEW_CLASS = 1 << 1
+PAT_IMPORTS_CHANGED = 1 << 2
+PAT_CONFIG_CHANGED = 1 << 3
+PAT_TESTS_ADDED = 1 << 4
+PAT_ERROR_HANDLING = 1 << 5
+PAT_COMMENTS_ADDED = 1 << 6
+
+# Markdown descriptions, in the alphabetical order of the pattern names
+_PATTERN_DESCRIPTIONS = (
+    (PAT_COMMENTS_ADDED, "Comments/documentation added"),
+    (PAT_CONFIG_CHANGED, "Config Changed"),
+    (PAT_ERROR_HANDLING, "Error handling added/modified"),
+    (PAT_IMPORTS_CHANGED, "Import statements modified"),
+    (PAT_NEW_CLASS, "New classes defined"),
+    (PAT_NEW_FUNCTION, "New functions/methods added"),
+    (PAT_TESTS_ADDED, "Test cases added"),
+)
+
+# Pattern detection on added lines. Each regex runs over a whole file's diff
+# at once, so the per-line scanning happens inside the regex engine rather
+# than in a Python loop. Leading whitespace is skipped to match indented code.
+# Declarations and comments are never counted as tests or error handling.
+_ADDED_LINE = r"^\+(?!\+\+)"
+_DECLARATION = r"[^\S\n]*(?:def |function |func |class |import |from )"
+_COMMENT = r"[^\S\n]*(?:#|//|/\*)"
+_STARTS_WITH_RE = re.compile(
+    _ADDED_LINE
+    + r"[^\S\n]*(?:(def |function |func )|(class )|(import |from )|(#|//|/\*))",
+    re.MULTILINE,
+)
+_STARTS_WITH_PATTERNS = (
+    0,
+    PAT_NEW_FUNCTION,
+    PAT_NEW_CLASS,
+    PAT_IMPORTS_CHANGED,
+    PAT_COMMENTS_ADDED,
+)
+_STARTS_WITH_ALL = (
+    PAT_NEW_FUNCTION | PAT_NEW_CLASS | PAT_IMPORTS_CHANGED | PAT_COMMENTS_ADDED
+)
+_TESTS_ADDED_RE = re.compile(
+    _ADDED_LINE
+    + f"(?!{_DECLARATION}|{_COMMENT})"
+    + r"(?=[^\n]*(?i:test))[^\n]*?(?:def |it\(|describe\()",
+    re.MULTILINE,
+)
+_ERROR_HANDLING_RE = re.compile(
+    _ADDED_LINE + f"(?!{_DECLARATION}|{_COMMENT})" + r"[^\n]*?(?:try:|catch|except)",
+    re.MULTILINE,
+)
+
+
+def _count_changed_lines(diff: str, marker: str) -> int:
+    """Count diff lines starting with marker, excluding +++/--- headers."""
+    header = marker * 3
+    count = diff.count("\n" + marker) - diff.count("\n" + header)
+    if diff.startswith(marker) and not diff.startswith(header):
+        count += 1
+    return count
+
+
+def analyze_diff(diff_lines: Iterable[str]) -> dict:
+    """Analyze a file's diff lines to understand what changed.
+
+    Joins the file's lines once, then counts additions/deletions with
+    str.count and detects patterns with precompiled regexes.
     """
-    additions = 0
-    deletions = 0
-    patterns = {
-        "new_function": False,
-        "new_class": False,
-        "imports_changed": False,
-        "config_changed": False,
-        "tests_added": False,
-        "error_handling": False,
-        "comments_added": False,
-    }
+    diff = "".join(diff_lines)
+    patterns = 0
 
-    for line in diff.split("\n"):
-        # Skip diff metadata lines
-        if line.startswith("+++") or line.startswith("---"):
-            continue
+    for match in _STARTS_WITH_RE.finditer(diff):
+        patterns |= _STARTS_WITH_PATTERNS[match.lastindex]
+        if patterns == _STARTS_WITH_ALL:
+            break
 
-        if line.startswith("+"):
-            additions += 1
-            content = line[1:].strip()
-
-            # Detect patterns in added lines
-            if content.startswith(("def ", "function ", "func ")):
-                patterns["new_function"] = True
-            elif content.startswith("class "):
-                patterns["new_class"] = True
-            elif content.startswith(("import ", "from ")):
-                patterns["imports_changed"] = True
-            elif "test" in content.lower() and any(
-                x in content for x in ("def ", "it(", "describe(")
-            ):
-                patterns["tests_added"] = True
-            elif any(x in content for x in ("try:", "catch", "except")):
-                patterns["error_handling"] = True
-            elif content.startswith(("#", "//", "/*")):
-                patterns["comments_added"] = True
-
-        elif line.startswith("-"):
-            deletions += 1
+    if _TESTS_ADDED_RE.search(diff):
+        patterns |= PAT_TESTS_ADDED
+    if _ERROR_HANDLING_RE.search(diff):
+        patterns |= PAT_ERROR_HANDLING
 
     return {
-        "additions": additions,
-        "deletions": deletions,
+        "additions": _count_changed_lines(diff, "+"),
+        "deletions": _count_changed_lines(diff, "-"),
         "patterns": patterns,
     }
 
 
-def infer_change_type(categories: set[str], patterns_by_file: dict[str, dict]) -> str:
-    """Infer the type of change based on categories and patterns."""
-    # Aggregate all patterns
-    all_patterns: dict[str, bool] = {}
-    for file_patterns in patterns_by_file.values():
-        for key, value in file_patterns.items():
-            if value:
-                all_patterns[key] = True
+def infer_change_type(categories: set[str], all_patterns: int) -> str:
+    """Infer the type of change based on categories and patterns.
 
+    all_patterns is the OR of every file's PAT_* flags.
+    """
     # Check for specific change types
     if "tests" in categories:
-        if all_patterns.get("tests_added"):
+        if all_patterns & PAT_TESTS_ADDED:
             return "test"
         return "test-update"
     if "ci-cd" in categories or "hooks" in categories:
@@ -254,7 +333,7 @@ def infer_change_type(categories: set[str], patterns_by_file: dict[str, dict]) -
         return "docs"
     if "dependencies" in categories:
         return "deps"
-    if all_patterns.get("new_function") or all_patterns.get("new_class"):
+    if all_patterns & (PAT_NEW_FUNCTION | PAT_NEW_CLASS):
         return "feat"
     if "ai-config" in categories or "commands" in categories or "skills" in categories:
         return "feat"
@@ -267,14 +346,47 @@ def infer_change_type(categories: set[str], patterns_by_file: dict[str, dict]) -
 
 
 def generate_context(
-    changed_files: list[str],
     base: str | None = None,
     head: str | None = None,
+    fast: bool = False,
 ) -> dict:
     """Generate context document for changes.
 
-    Fetches the full diff once and parses it to avoid N+1 git calls.
+    Streams the full diff once and analyzes each file as it arrives,
+    avoiding N+1 git calls without buffering the whole diff. The list
+    of changed files comes from the same diff, so no separate
+    --name-only call is needed.
+
+    With fast=True only --numstat counts are fetched and pattern detection
+    is skipped. Once the streamed diff passes FAST_PATH_LINE_THRESHOLD
+    changed lines, streaming stops and the same fast path is taken.
     """
+    diff_analyses: dict[str, dict] = {}
+    if not fast:
+        # Stream the full diff once, keeping only the per-file analyses
+        changed_lines = 0
+        file_diffs = iter_file_diffs(base, head)
+        for filepath, diff_lines in file_diffs:
+            analysis = analyze_diff(diff_lines)
+            diff_analyses[filepath] = analysis
+            changed_lines += analysis["additions"] + analysis["deletions"]
+            if changed_lines > FAST_PATH_LINE_THRESHOLD:
+                file_diffs.close()
+                fast = True
+                break
+
+    if fast:
+        # Line counts only - no diff content crosses the pipe
+        diff_analyses = {
+            filepath: {
+                "additions": adds,
+                "deletions": dels,
+                "patterns": 0,
+            }
+            for filepath, (adds, dels) in get_numstat(base, head).items()
+        }
+
+    changed_files = list(diff_analyses)
     if not changed_files:
         return {
             "summary": "No changes detected",
@@ -283,33 +395,27 @@ def generate_context(
             "change_type": "none",
         }
 
-    # Get full diff once and parse it
-    full_diff = get_full_diff(base, head)
-    file_diffs = parse_diff_by_file(full_diff)
-
     # Categorize files and analyze diffs
-    categories: dict[str, list[str]] = {}
+    categories: defaultdict[str, list[str]] = defaultdict(list)
     file_analyses: dict[str, dict] = {}
+    all_patterns = 0
+    total_additions = 0
+    total_deletions = 0
 
-    for filepath in changed_files:
+    for filepath, analysis in diff_analyses.items():
         # Categorize
-        category = categorize_file(filepath)
-        if category not in categories:
-            categories[category] = []
-        categories[category].append(filepath)
+        categories[categorize_file(filepath)].append(filepath)
+        file_analyses[filepath] = analysis
 
-        # Analyze diff (from parsed data, not a new git call)
-        diff_content = file_diffs.get(filepath, "")
-        file_analyses[filepath] = analyze_diff(diff_content)
+        # Aggregate stats and patterns in the same pass
+        total_additions += analysis["additions"]
+        total_deletions += analysis["deletions"]
+        all_patterns |= analysis["patterns"]
 
     # Infer change type
-    patterns_by_file = {f: a["patterns"] for f, a in file_analyses.items()}
-    change_type = infer_change_type(set(categories.keys()), patterns_by_file)
+    change_type = infer_change_type(set(categories.keys()), all_patterns)
 
     # Recalculate change type based on actual additions/deletions
-    total_additions = sum(a["additions"] for a in file_analyses.values())
-    total_deletions = sum(a["deletions"] for a in file_analyses.values())
-
     if change_type == "chore" and total_deletions > total_additions * 2:
         change_type = "refactor"
     elif change_type == "chore" and total_additions > 0:
@@ -322,7 +428,7 @@ def generate_context(
     return {
         "summary": summary,
         "files": changed_files,
-        "categories": categories,
+        "categories": dict(categories),
         "file_analyses": file_analyses,
         "change_type": change_type,
         "total_additions": total_additions,
@@ -333,62 +439,51 @@ def generate_context(
 
 
 def format_markdown(context: dict) -> str:
-    """Format context as markdown."""
-    mode_label = "PR Diff" if context.get("mode") == "pr-diff" else "Staged Changes"
-    lines = [
-        "# Commit Context",
-        "",
-        f"**Generated:** {context.get('timestamp', 'unknown')}",
-        f"**Mode:** {mode_label}",
-        f"**Change Type:** `{context.get('change_type', 'unknown')}`",
-        "",
-        "## Summary",
-        "",
-        context.get("summary", "No summary"),
-        "",
-    ]
+    """Format context as markdown.
 
+    Writes straight into one buffer; each section opens with its own
+    separating blank line so no intermediate line lists are built.
+    """
+    mode_label = "PR Diff" if context.get("mode") == "pr-diff" else "Staged Changes"
+    buf = io.StringIO()
+    w = buf.write
+    w("# Commit Context\n\n")
+    w(f"**Generated:** {context.get('timestamp', 'unknown')}\n")
+    w(f"**Mode:** {mode_label}\n")
+    w(f"**Change Type:** `{context.get('change_type', 'unknown')}`\n\n")
+    w("## Summary\n\n")
+    w(f"{context.get('summary', 'No summary')}\n")
+
+    file_analyses = context.get("file_analyses", {})
     categories = context.get("categories", {})
     if categories:
-        lines.extend(["## Changes by Category", ""])
+        w("\n## Changes by Category\n")
         for cat, files in sorted(categories.items()):
-            lines.append(f"### {cat.replace('-', ' ').title()}")
+            w(f"\n### {cat.replace('-', ' ').title()}\n")
             for f in files:
-                analysis = context.get("file_analyses", {}).get(f, {})
+                analysis = file_analyses.get(f, {})
                 adds = analysis.get("additions", 0)
                 dels = analysis.get("deletions", 0)
-                lines.append(f"- `{f}` (+{adds}/-{dels})")
-            lines.append("")
+                w(f"- `{f}` (+{adds}/-{dels})\n")
 
     # Add pattern insights
-    all_patterns = set()
-    for analysis in context.get("file_analyses", {}).values():
-        for pattern, found in analysis.get("patterns", {}).items():
-            if found:
-                all_patterns.add(pattern)
+    all_patterns = 0
+    for analysis in file_analyses.values():
+        all_patterns |= analysis.get("patterns", 0)
 
     if all_patterns:
-        lines.extend(["## Detected Patterns", ""])
-        pattern_descriptions = {
-            "new_function": "New functions/methods added",
-            "new_class": "New classes defined",
-            "imports_changed": "Import statements modified",
-            "tests_added": "Test cases added",
-            "error_handling": "Error handling added/modified",
-            "comments_added": "Comments/documentation added",
-        }
-        for pattern in sorted(all_patterns):
-            desc = pattern_descriptions.get(pattern, pattern.replace("_", " ").title())
-            lines.append(f"- {desc}")
-        lines.append("")
+        w("\n## Detected Patterns\n\n")
+        for flag, desc in _PATTERN_DESCRIPTIONS:
+            if all_patterns & flag:
+                w(f"- {desc}\n")
 
-    return "\n".join(lines)
+    return buf.getvalue()
 
 
-def format_json(context: dict) -> str:
-    """Format context as JSON for machine consumption."""
+def _clean_context(context: dict) -> dict:
+    """Select the JSON-serializable summary fields of a context."""
     # Remove non-serializable items and large data
-    clean = {
+    return {
         "summary": context.get("summary"),
         "change_type": context.get("change_type"),
         "files": context.get("files"),
@@ -398,7 +493,16 @@ def format_json(context: dict) -> str:
         "timestamp": context.get("timestamp"),
         "mode": context.get("mode"),
     }
-    return json.dumps(clean, indent=2)
+
+
+def format_json(clean: dict, compact: bool = False) -> str:
+    """Format a cleaned context as JSON for machine consumption.
+
+    Non-ASCII paths are written as-is rather than as \\uXXXX escapes.
+    """
+    if compact:
+        return json.dumps(clean, separators=(",", ":"), ensure_ascii=False)
+    return json.dumps(clean, indent=2, ensure_ascii=False)
 
 
 def main():
@@ -424,6 +528,11 @@ def main():
         action="store_true",
         help="Output JSON instead of markdown (implies --stdout)",
     )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Skip pattern detection and take line counts from git diff --numstat",
+    )
     parser.add_argument(
         "--output-dir",
         default=".claude/artifacts",
@@ -445,8 +554,9 @@ def main():
     except Exception:
         pass
 
-    # Get changed files
-    changed_files = get_changed_files(args.base, args.head)
+    # Generate context (the changed files come from the same diff)
+    context = generate_context(args.base, args.head, fast=args.fast)
+    changed_files = context["files"]
 
     if not changed_files:
         if args.json:
@@ -459,12 +569,9 @@ def main():
             print("No changes to document")
         sys.exit(0)
 
-    # Generate context
-    context = generate_context(changed_files, args.base, args.head)
-
     # Output
     if args.json:
-        print(format_json(context))
+        print(format_json(_clean_context(context), compact=True))
     elif args.stdout:
         print(format_markdown(context))
     else:
@@ -475,12 +582,12 @@ def main():
         # Save markdown context
         md_content = format_markdown(context)
         md_path = artifacts_dir / "commit-context.md"
-        md_path.write_text(md_content)
+        md_path.write_text(md_content, encoding="utf-8")
 
         # Save JSON context for machine consumption
-        json_content = format_json(context)
+        json_content = format_json(_clean_context(context))
         json_path = artifacts_dir / "commit-context.json"
-        json_path.write_text(json_content)
+        json_path.write_text(json_content, encoding="utf-8")
 
         # Print summary to stdout
         mode = "PR diff" if args.base else "staged changes"
@@ -8,7 +8,8 @@ to determine which file was modified.
 
 Supported formatters:
 - Prettier: JS, TS, JSX, TSX, JSON, MD, CSS, HTML, Vue, Svelte
-- Black + isort: Python
+- Black + isort: Python (Black through a background blackd with
+  CLAUDE_USE_BLACKD=1)
 - gofmt: Go
 - rustfmt: Rust
 - rubocop: Ruby
@@ -17,91 +18,326 @@ Supported formatters:
 
 import json
 import os
+import shutil
 import subprocess
 import sys
 from pathlib import Path
+from typing import List, Optional
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-def format_file(file_path: str) -> None:
-    """Apply the appropriate formatter based on file extension."""
-    if not os.path.exists(file_path):
+# blackd: Black's HTTP formatting server, kept running across hook calls.
+# Opt-in, since it leaves a daemon listening on a local port.
+BLACKD_HOST = "127.0.0.1"
+BLACKD_PORT = 45484
+BLACKD_PIDFILE = Path.home() / ".claude" / "blackd.pid"
+
+# Vendored, generated and cache directories that are never formatted
+SKIP_DIRS = frozenset(
+    {
+        "node_modules",
+        ".venv",
+        "venv",
+        "dist",
+        "build",
+        ".git",
+        "__pycache__",
+        ".mypy_cache",
+        ".tox",
+    }
+)
+
+# Files larger than this are assumed to be generated
+MAX_FORMAT_BYTES = 1_000_000
+
+# Extension -> formatter command (the file path is appended)
+SINGLE_FORMATTERS = {
+    # Go -> gofmt
+    ".go": ["gofmt", "-w"],
+    # Rust -> rustfmt
+    ".rs": ["rustfmt"],
+    # Ruby -> rubocop
+    ".rb": ["rubocop", "-a"],
+    # Shell -> shfmt
+    ".sh": ["shfmt", "-w"],
+    ".bash": ["shfmt", "-w"],
+}
+
+# JavaScript/TypeScript/Web -> Prettier
+PRETTIER_EXTENSIONS = (
+    ".js",
+    ".ts",
+    ".tsx",
+    ".jsx",
+    ".json",
+    ".md",
+    ".css",
+    ".html",
+    ".vue",
+    ".svelte",
+)
+
+
+def ensure_blackd() -> bool:
+    """Start blackd in the background unless it is already running.
+
+    blackd counts as running when something answers on its port. Where
+    /proc exists, the pidfile process must also be blackd, so an unrelated
+    server on the port is never sent source code. Returns False if blackd
+    is not installed or the port is held by something else.
+    """
+    if not shutil.which("blackd"):
+        return False
+
+    if _blackd_port_open():
+        return not os.path.isdir("/proc") or _pidfile_is_blackd()
+
+    proc = subprocess.Popen(
+        ["blackd", "--bind-host", BLACKD_HOST, "--bind-port", str(BLACKD_PORT)],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    BLACKD_PIDFILE.parent.mkdir(parents=True, exist_ok=True)
+    BLACKD_PIDFILE.write_text(str(proc.pid))
+    return True
+
+
+def _blackd_port_open() -> bool:
+    """Check whether anything accepts connections on blackd's port."""
+    import socket
+
+    try:
+        socket.create_connection((BLACKD_HOST, BLACKD_PORT), timeout=1).close()
+    except OSError:
+        return False
+    return True
+
+
+def _pidfile_is_blackd() -> bool:
+    """Check via /proc that the pidfile names a running blackd.
+
+    The pid may have been reused by an unrelated process.
+    """
+    try:
+        pid = int(BLACKD_PIDFILE.read_text())
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            argv = f.read().split(b"\0")
+    except (OSError, ValueError):
+        return False
+    return any(os.path.basename(arg) == b"blackd" for arg in argv[:2])
+
+
+def has_black_config(path: Path) -> bool:
+    """Check whether the project containing path configures Black.
+
+    blackd ignores pyproject.toml, so it is only used for projects that
+    run Black with its defaults.
+    """
+    for directory in path.resolve().parents:
+        pyproject = directory / "pyproject.toml"
+        if pyproject.is_file():
+            return "[tool.black]" in pyproject.read_text(errors="replace")
+        if (directory / ".git").exists():
+            break
+    return False
+
+
+def blackd_format(path: Path) -> Optional[bytes]:
+    """Format a Python file through blackd.
+
+    Returns the formatted source, or None when blackd is not enabled, not
+    installed or still starting up, so the caller can fall back to the black
+    CLI.
+    """
+    if (
+        os.environ.get("CLAUDE_USE_BLACKD") != "1"
+        or has_black_config(path)
+        or not ensure_blackd()
+    ):
+        return None
+
+    import http.client
+
+    source = path.read_bytes()
+    headers = {"Content-Type": "text/plain; charset=utf-8"}
+    conn = http.client.HTTPConnection(BLACKD_HOST, BLACKD_PORT, timeout=10)
+    try:
+        conn.request("POST", "/", body=source, headers=headers)
+        response = conn.getresponse()
+        body = response.read()
+    except OSError:
+        return None
+    finally:
+        conn.close()
+
+    if response.status == 200:
+        return body
+    if response.status == 204:
+        # Already formatted
+        return source
+    return None
+
+
+def run_pipeline(
+    cmds: List[List[str]], file_path: str, source: Optional[bytes] = None
+) -> None:
+    """Pipe a file through several formatters and write the result back.
+
+    Every formatter is launched up front, so their interpreter startup and
+    config discovery overlap. Each one reads the previous formatter's output
+    on stdin, so they never race on the file itself. Formatters that are not
+    installed are skipped, and the file is only rewritten if every stage
+    succeeded and the content actually changed.
+
+    If source is given it is fed to the pipeline in place of the file's
+    current content (e.g. output already produced by blackd).
+    """
+    with open(file_path, "rb") as f:
+        original = f.read()
+    if source is None:
+        source = original
+
+    cmds = [cmd for cmd in cmds if shutil.which(cmd[0])]
+    output = _pipe(cmds, source) if cmds else source
+
+    if output is None or output == original:
         return
 
-    path = Path(file_path)
-    ext = path.suffix.lower()
+    with open(file_path, "wb") as f:
+        f.write(output)
+
 
+def _pipe(cmds: List[List[str]], source: bytes) -> Optional[bytes]:
+    """Run source through a chain of stdin/stdout commands.
+
+    Returns None if any stage fails or times out.
+    """
+    procs = []
     try:
-        # JavaScript/TypeScript/Web -> Prettier
-        if ext in (
-            ".js",
-            ".ts",
-            ".tsx",
-            ".jsx",
-            ".json",
-            ".md",
-            ".css",
-            ".html",
-            ".vue",
-            ".svelte",
-        ):
-            subprocess.run(
-                ["npx", "prettier", "--write", file_path],
+        stdin = subprocess.PIPE
+        for cmd in cmds:
+            proc = subprocess.Popen(
+                cmd,
+                stdin=stdin,
+                stdout=subprocess.PIPE,
                 stderr=subprocess.DEVNULL,
-                stdout=subprocess.DEVNULL,
-                timeout=30,
             )
+            if procs:
+                # The next stage now owns the read end of this pipe
+                procs[-1].stdout.close()
+            procs.append(proc)
+            stdin = proc.stdout
 
-        # Python -> Black + isort
-        elif ext == ".py":
-            subprocess.run(
-                ["black", "--quiet", file_path],
-                stderr=subprocess.DEVNULL,
-                stdout=subprocess.DEVNULL,
-                timeout=30,
-            )
-            subprocess.run(
-                ["isort", "--quiet", file_path],
-                stderr=subprocess.DEVNULL,
-                stdout=subprocess.DEVNULL,
-                timeout=30,
-            )
+        first, last = procs[0], procs[-1]
+        if first is last:
+            output, _ = first.communicate(source, timeout=30)
+        else:
+            try:
+                first.stdin.write(source)
+                first.stdin.close()
+            except BrokenPipeError:
+                pass
+            output, _ = last.communicate(timeout=30)
+            for proc in procs[:-1]:
+                proc.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        for proc in procs:
+            proc.kill()
+        return None
 
-        # Go -> gofmt
-        elif ext == ".go":
-            subprocess.run(
-                ["gofmt", "-w", file_path],
-                stderr=subprocess.DEVNULL,
-                stdout=subprocess.DEVNULL,
-                timeout=30,
-            )
+    if any(proc.returncode != 0 for proc in procs):
+        return None
+    return output
 
-        # Rust -> rustfmt
-        elif ext == ".rs":
-            subprocess.run(
-                ["rustfmt", file_path],
-                stderr=subprocess.DEVNULL,
-                stdout=subprocess.DEVNULL,
-                timeout=30,
-            )
 
-        # Ruby -> rubocop
-        elif ext == ".rb":
-            subprocess.run(
-                ["rubocop", "-a", file_path],
-                stderr=subprocess.DEVNULL,
-                stdout=subprocess.DEVNULL,
-                timeout=30,
-            )
+def prettier_command(path: Path) -> List[str]:
+    """Resolve the Prettier command for a file.
 
-        # Shell -> shfmt
-        elif ext in (".sh", ".bash"):
-            subprocess.run(
-                ["shfmt", "-w", file_path],
-                stderr=subprocess.DEVNULL,
-                stdout=subprocess.DEVNULL,
-                timeout=30,
+    Prefers the project's node_modules/.bin/prettier (nearest ancestor up to
+    the repository root), then a prettier on PATH, so the common case skips
+    npx's package resolution. Falls back to npx.
+    """
+    for directory in path.resolve().parents:
+        local = directory / "node_modules" / ".bin" / "prettier"
+        if local.is_file():
+            return [str(local), "--write"]
+        if (directory / ".git").exists():
+            break
+
+    installed = shutil.which("prettier")
+    if installed:
+        return [installed, "--write"]
+    return ["npx", "prettier", "--write"]
+
+
+def in_skipped_dir(path: Path) -> bool:
+    """Check whether path sits in a skipped directory of the project.
+
+    Only the directories below the project root (the working directory) are
+    checked, so a project that itself lives under e.g. build/ is still
+    formatted. Files outside the project are never skipped.
+    """
+    try:
+        relative = path.resolve().relative_to(Path.cwd())
+    except ValueError:
+        return False
+    return not SKIP_DIRS.isdisjoint(relative.parts[:-1])
+
+
+def format_file(file_path: str) -> None:
+    """Apply the appropriate formatter based on file extension."""
+    path = Path(file_path)
+    try:
+        size = path.stat().st_size
+    except OSError:
+        return
+
+    # Skip vendored and generated files before spawning anything
+    if (
+        in_skipped_dir(path)
+        or size > MAX_FORMAT_BYTES
+        or "generated" in path.name.lower()
+    ):
+        return
+
+    ext = path.suffix.lower()
+
+    # Python -> Black (via blackd when available) + isort
+    if ext == ".py":
+        isort_cmd = ["isort", "--quiet", "--filename", file_path, "-"]
+        formatted = blackd_format(path)
+        if formatted is not None:
+            run_pipeline([isort_cmd], file_path, source=formatted)
+        else:
+            # Piped so both formatters start concurrently
+            run_pipeline(
+                [
+                    ["black", "--quiet", "--stdin-filename", file_path, "-"],
+                    isort_cmd,
+                ],
+                file_path,
             )
+    elif ext in PRETTIER_EXTENSIONS:
+        run_formatter([*prettier_command(path), file_path])
+    elif ext in SINGLE_FORMATTERS:
+        run_formatter([*SINGLE_FORMATTERS[ext], file_path])
 
+
+def run_formatter(cmd: List[str]) -> None:
+    """Run a single formatter, giving up after 30 seconds."""
+    try:
+        subprocess.run(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            timeout=30,
+        )
     except (subprocess.TimeoutExpired, FileNotFoundError):
         # Formatter not installed or timed out - fail silently
         pass
@@ -109,8 +345,11 @@ def format_file(file_path: str) -> None:
 
 def main():
     try:
-        # Read Claude's tool input from stdin
-        input_data = json.load(sys.stdin)
+        # Read Claude's tool input from stdin as raw bytes and decode once
+        raw = sys.stdin.buffer.read()
+        if not raw:
+            return
+        input_data = orjson.loads(raw) if orjson is not None else json.loads(raw)
 
         # Extract file path from tool_input
         file_path = input_data.get("tool_input", {}).get("file_path")
@@ -119,7 +358,7 @@ def main():
             format_file(file_path)
 
     except (json.JSONDecodeError, KeyError):
-        # Invalid input - fail silently
+        # Invalid input - fail silently (orjson's error subclasses json's)
         pass
     except Exception:
         # Catch-all to never block the agent
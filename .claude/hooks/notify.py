@@ -16,13 +16,59 @@ Configuration:
 import argparse
 import json
 import os
-import smtplib
 import sys
-import urllib.error
-import urllib.request
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from urllib.parse import urlsplit
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Hosts whose last send failed at the transport level, as
+# host -> [retry_after_epoch, consecutive_failures]. Sends to them are
+# skipped until the backoff expires instead of waiting out a timeout.
+DEADHOSTS_FILE = Path.home() / ".claude" / ".notify_deadhosts.json"
+DEADHOSTS_MAX_BACKOFF = 600
+_deadhosts = None
+_deadhosts_lock = threading.Lock()
+
+
+# Per-platform presentation of each alert level
+_SLACK_COLORS = {
+    "error": "#FF0000",
+    "warning": "#FFA500",
+    "success": "#00FF00",
+    "info": "#0000FF",
+}
+_TELEGRAM_EMOJI = {"error": "🔴", "warning": "🟡", "success": "🟢", "info": "🔵"}
+_DISCORD_COLORS = {
+    "error": 0xFF0000,
+    "warning": 0xFFA500,
+    "success": 0x00FF00,
+    "info": 0x0000FF,
+}
+_NTFY_PRIORITIES = {"error": "5", "warning": "4", "success": "3", "info": "3"}
+_NTFY_TAGS = {
+    "error": "x",
+    "warning": "warning",
+    "success": "white_check_mark",
+    "info": "information_source",
+}
+
+
+# Settings each platform cannot send without
+_REQUIRED_SETTINGS = {
+    "slack": ("webhook_url",),
+    "telegram": ("bot_token", "chat_id"),
+    "discord": ("webhook_url",),
+    "ntfy": ("topic",),
+    "email": ("smtp_host", "smtp_user", "smtp_password", "from_address", "to_address"),
+    "webhook": ("url",),
+}
 
 
 def load_config():
@@ -34,15 +80,18 @@ def load_config():
     ]
 
     for path in config_paths:
-        if path.exists():
-            try:
-                with open(path) as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                print(f"Warning: Invalid JSON in {path}", file=sys.stderr)
-
-    # Fall back to environment variables
-    return {
+        # A missing file fails the open itself; no exists() check needed
+        try:
+            with open(path, "rb") as f:
+                return _json_loads(f.read())
+        except OSError:
+            continue
+        except json.JSONDecodeError:
+            print(f"Warning: Invalid JSON in {path}", file=sys.stderr)
+
+    # Fall back to environment variables, keeping only the platforms whose
+    # required settings are all present
+    env_config = {
         "slack": {"webhook_url": os.environ.get("SLACK_WEBHOOK_URL")},
         "telegram": {
             "bot_token": os.environ.get("TELEGRAM_BOT_TOKEN"),
@@ -64,6 +113,11 @@ def load_config():
         },
         "webhook": {"url": os.environ.get("CUSTOM_WEBHOOK_URL")},
     }
+    return {
+        platform: settings
+        for platform, settings in env_config.items()
+        if all(settings.get(key) for key in _REQUIRED_SETTINGS[platform])
+    }
 
 
 def send_slack(config, title, message, level):
@@ -72,12 +126,7 @@ def send_slack(config, title, message, level):
     if not webhook_url:
         return False
 
-    color = {
-        "error": "#FF0000",
-        "warning": "#FFA500",
-        "success": "#00FF00",
-        "info": "#0000FF",
-    }.get(level, "#808080")
+    color = _SLACK_COLORS.get(level, "#808080")
 
     payload = {
         "attachments": [
@@ -101,9 +150,7 @@ def send_telegram(config, title, message, level):
     if not bot_token or not chat_id:
         return False
 
-    emoji = {"error": "🔴", "warning": "🟡", "success": "🟢", "info": "🔵"}.get(
-        level, "⚪"
-    )
+    emoji = _TELEGRAM_EMOJI.get(level, "⚪")
 
     text = f"{emoji} *{title}*\n\n{message}"
 
@@ -123,12 +170,7 @@ def send_discord(config, title, message, level):
     if not webhook_url:
         return False
 
-    color = {
-        "error": 0xFF0000,
-        "warning": 0xFFA500,
-        "success": 0x00FF00,
-        "info": 0x0000FF,
-    }.get(level, 0x808080)
+    color = _DISCORD_COLORS.get(level, 0x808080)
 
     payload = {
         "embeds": [
@@ -155,15 +197,8 @@ def send_ntfy(config, title, message, level):
 
     url = f"{server.rstrip('/')}/{topic}"
 
-    priority = {"error": "5", "warning": "4", "success": "3", "info": "3"}.get(
-        level, "3"
-    )
-    tags = {
-        "error": "x",
-        "warning": "warning",
-        "success": "white_check_mark",
-        "info": "information_source",
-    }.get(level, "")
+    priority = _NTFY_PRIORITIES.get(level, "3")
+    tags = _NTFY_TAGS.get(level, "")
 
     headers = {
         "Title": title,
@@ -175,11 +210,7 @@ def send_ntfy(config, title, message, level):
         headers["Authorization"] = f"Bearer {token}"
 
     try:
-        req = urllib.request.Request(
-            url, data=message.encode(), headers=headers, method="POST"
-        )
-        with urllib.request.urlopen(req, timeout=10) as response:
-            return response.status == 200
+        return _post(url, message.encode(), headers) == 200
     except Exception as e:
         print(f"ntfy error: {e}", file=sys.stderr)
         return False
@@ -187,8 +218,12 @@ def send_ntfy(config, title, message, level):
 
 def send_email(config, title, message, level):
     """Send notification via email."""
-    required = ["smtp_host", "smtp_user", "smtp_password", "from_address", "to_address"]
-    if not all(config.get(k) for k in required):
+    # Imported here: the email stack is only needed when email is configured
+    import smtplib
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
+    if not all(config.get(k) for k in _REQUIRED_SETTINGS["email"]):
         return False
 
     try:
@@ -227,15 +262,102 @@ def send_webhook(config, title, message, level):
     return _send_json_request(url, payload)
 
 
+def _json_dumps(obj):
+    """Serialize to JSON bytes, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
+def _json_loads(data):
+    """Parse JSON bytes, using orjson when installed.
+
+    orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers
+    catch the stdlib exception either way.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _post(url, body, headers):
+    """POST a request body and return the HTTP status code.
+
+    Raises ConnectionError without sending if the host failed recently and
+    its backoff has not expired.
+    """
+    # hostname:port rather than netloc, which would store any userinfo
+    # credentials in the dead-host file
+    parts = urlsplit(url)
+    host = parts.hostname or ""
+    if parts.port:
+        host = f"{host}:{parts.port}"
+    with _deadhosts_lock:
+        deadhosts = _load_deadhosts()
+        retry_after = deadhosts.get(host, (0, 0))[0]
+    if time.time() < retry_after:
+        raise ConnectionError(f"{host} failed recently, skipping until backoff ends")
+
+    try:
+        status = _send_post(url, body, headers)
+    except Exception:
+        _record_host_result(host, failed=True)
+        raise
+    _record_host_result(host, failed=False)
+    return status
+
+
+def _send_post(url, body, headers):
+    # urllib.request honours HTTP(S)_PROXY/NO_PROXY and follows redirects
+    import urllib.error
+    import urllib.request
+
+    req = urllib.request.Request(url, data=body, headers=headers, method="POST")
+    try:
+        with urllib.request.urlopen(req, timeout=10) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        # The host answered, so this is not a transport failure
+        return e.code
+
+
+def _load_deadhosts():
+    """Load the dead-host table once per process. Call with the lock held."""
+    global _deadhosts
+    if _deadhosts is None:
+        try:
+            _deadhosts = _json_loads(DEADHOSTS_FILE.read_bytes())
+        except (OSError, ValueError):
+            _deadhosts = {}
+    return _deadhosts
+
+
+def _record_host_result(host, failed):
+    """Update a host's backoff after a send and persist any change."""
+    with _deadhosts_lock:
+        deadhosts = _load_deadhosts()
+        if failed:
+            failures = deadhosts.get(host, (0, 0))[1] + 1
+            backoff = min(DEADHOSTS_MAX_BACKOFF, 2**failures)
+            deadhosts[host] = [time.time() + backoff, failures]
+        elif deadhosts.pop(host, None) is None:
+            return
+
+        try:
+            DEADHOSTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+            tmp = DEADHOSTS_FILE.with_name(f"{DEADHOSTS_FILE.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(_json_dumps(deadhosts))
+            os.replace(tmp, DEADHOSTS_FILE)
+        except OSError:
+            pass
+
+
 def _send_json_request(url, payload):
     """Send a JSON POST request."""
     try:
-        data = json.dumps(payload).encode()
-        req = urllib.request.Request(
-            url, data=data, headers={"Content-Type": "application/json"}, method="POST"
-        )
-        with urllib.request.urlopen(req, timeout=10) as response:
-            return response.status in [200, 201, 204]
+        data = _json_dumps(payload)
+        status = _post(url, data, {"Content-Type": "application/json"})
+        return status in [200, 201, 204]
     except Exception as e:
         print(f"Request error: {e}", file=sys.stderr)
         return False
@@ -277,12 +399,29 @@ def main():
 
     platforms = args.platform if args.platform else senders.keys()
 
+    # Send to all platforms concurrently so total latency is the slowest
+    # platform rather than the sum of all of them. A single platform is sent
+    # inline; there is nothing to overlap it with.
+    targets = [p for p in platforms if p in senders and p in config]
     results = {}
-    for platform in platforms:
-        if platform in senders and platform in config:
-            results[platform] = senders[platform](
-                config[platform], args.title, args.message, args.level
-            )
+    if len(targets) == 1:
+        platform = targets[0]
+        results[platform] = senders[platform](
+            config[platform], args.title, args.message, args.level
+        )
+    elif targets:
+        with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+            futures = {
+                platform: executor.submit(
+                    senders[platform],
+                    config[platform],
+                    args.title,
+                    args.message,
+                    args.level,
+                )
+                for platform in targets
+            }
+        results = {platform: future.result() for platform, future in futures.items()}
 
     # Print results
     sent_to = [p for p, success in results.items() if success]
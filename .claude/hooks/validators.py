@@ -6,10 +6,16 @@ This module provides common validation functions used across hooks to ensure
 consistent input validation and error handling.
 """
 
+import functools
 import re
 import os
-import shlex
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
+
+# Path traversal ("..") or null bytes (injection attempt)
+_UNSAFE_PATH = re.compile(r"\.\.|\x00")
+
+# Characters that need shell quoting (same set as shlex.quote)
+_UNSAFE_SHELL_SEARCH = re.compile(r"[^\w@%+=:,./-]", re.ASCII).search
 
 
 def validate_file_path(file_path: Optional[str]) -> bool:
@@ -25,18 +31,14 @@ def validate_file_path(file_path: Optional[str]) -> bool:
     if not file_path:
         return False
 
-    # Check for path traversal attempts
-    if ".." in file_path:
-        return False
-
-    # Check for null bytes (injection attempt)
-    if "\x00" in file_path:
-        return False
-
     # Ensure path is not too long
     if len(file_path) > 4096:
         return False
 
+    # Check for path traversal attempts and null bytes in a single scan
+    if _UNSAFE_PATH.search(file_path):
+        return False
+
     return True
 
 
@@ -81,11 +83,36 @@ def is_safe_command(command: str, allowed_patterns: List[str]) -> bool:
     if not command or not isinstance(command, str):
         return False
 
-    for pattern in allowed_patterns:
-        if re.match(pattern, command):
-            return True
+    return any(
+        pattern.match(command)
+        for pattern in _compile_allow_list(tuple(allowed_patterns))
+    )
+
+
+# Backreferences (\1, (?P=name)) and global inline flags ((?i)) change
+# meaning once patterns are merged into one alternation
+_UNMERGEABLE = re.compile(r"\\[1-9]|\(\?P=|\(\?[aiLmsux]+\)")
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_allow_list(patterns: Tuple[str, ...]) -> List["re.Pattern[str]"]:
+    """
+    Compile an allow-list, merging it into a single alternation when safe.
+
+    Lists using backreferences, global inline flags or duplicate group names
+    cannot be merged without changing their meaning, so they are compiled
+    pattern by pattern instead.
+    """
+    if not patterns:
+        return []
 
-    return False
+    if not any(_UNMERGEABLE.search(p) for p in patterns):
+        try:
+            return [re.compile("|".join(f"(?:{p})" for p in patterns))]
+        except re.error:
+            pass
+
+    return [re.compile(p) for p in patterns]
 
 
 def validate_environment() -> Dict[str, bool]:
@@ -106,17 +133,50 @@ def validate_environment() -> Dict[str, bool]:
 
 def _command_exists(cmd: str) -> bool:
     """Check if a command exists in PATH."""
-    import shutil
+    if os.path.dirname(cmd) or os.name == "nt":
+        # The PATH index matches exact names only; shutil.which also handles
+        # Windows' PATHEXT (git -> git.exe) and case-insensitive names
+        import shutil
+
+        return shutil.which(cmd) is not None
+
+    path = os.environ.get("PATH", os.defpath)
+    if not path:
+        # Like shutil.which, an empty PATH finds nothing (not even in cwd)
+        return False
+    candidates = _path_index(path).get(cmd, ())
+    return any(
+        os.access(candidate, os.X_OK) and not os.path.isdir(candidate)
+        for candidate in candidates
+    )
+
+
+@functools.lru_cache(maxsize=4)
+def _path_index(path: str) -> Dict[str, List[str]]:
+    """
+    Map every file name on PATH to its locations, in PATH order.
 
-    return shutil.which(cmd) is not None
+    Built with one scandir() per PATH entry and cached per PATH value, so
+    each later lookup costs a single access() check instead of a stat of
+    every (directory, command) pair.
+    """
+    index: Dict[str, List[str]] = {}
+    for directory in path.split(os.pathsep):
+        try:
+            with os.scandir(directory or os.curdir) as entries:
+                for entry in entries:
+                    index.setdefault(entry.name, []).append(entry.path)
+        except OSError:
+            continue
+    return index
 
 
 def sanitize_commit_message(message: str) -> str:
     """
     Sanitize a commit message to prevent injection attacks.
 
-    IMPORTANT: This function uses shlex.quote() to properly escape the message
-    for shell usage. However, the RECOMMENDED approach is to pass arguments
+    IMPORTANT: This function quotes the message for shell usage exactly as
+    shlex.quote() does. However, the RECOMMENDED approach is to pass arguments
     as a list to subprocess.run() (e.g., ['git', 'commit', '-m', message])
     which bypasses the shell entirely and makes sanitization unnecessary.
 
@@ -149,6 +209,12 @@ def sanitize_commit_message(message: str) -> str:
     if len(message) > max_length:
         message = message[:max_length]
 
-    # Use shlex.quote() to properly escape the message for shell usage
-    # This handles all shell metacharacters correctly, including quotes
-    return shlex.quote(message.strip())
+    # Quote exactly like shlex.quote(): messages without shell metacharacters
+    # are returned as-is, anything else is single-quoted with embedded single
+    # quotes escaped
+    message = message.strip()
+    if not message:
+        return "''"
+    if _UNSAFE_SHELL_SEARCH(message) is None:
+        return message
+    return "'" + message.replace("'", "'\"'\"'") + "'"
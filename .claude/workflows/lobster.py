@@ -7,21 +7,109 @@ pipelines with approval gates.
 Full implementation is planned for Phase 4 (Enterprise).
 """
 
-import json
 import os
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# How hard _write_json works to keep a state file intact across crashes:
+# "none" writes in place, "rename" writes a temp file and renames it over
+# the target, "fsync" also flushes the temp file to disk before renaming.
+DURABILITY_LEVELS = ("none", "rename", "fsync")
+
+
+def _write_json(path, data, durability="rename"):
+    """Write JSON to path with the given durability level.
+
+    Output is compact unless CLAUDE_WORKFLOW_DEBUG is set, in which case
+    it is pretty-printed for inspection. Uses orjson when installed (with
+    non-str keys converted like json does); the json module is only
+    imported as a fallback.
+    """
+    pretty = bool(os.environ.get("CLAUDE_WORKFLOW_DEBUG"))
+    if durability == "none":
+        target = path
+    else:
+        target = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(target, "wb", buffering=1 << 16) as f:
+            if orjson is not None:
+                option = orjson.OPT_NON_STR_KEYS
+                if pretty:
+                    option |= orjson.OPT_INDENT_2
+                f.write(orjson.dumps(data, option=option))
+            else:
+                import json
+
+                if pretty:
+                    text = json.dumps(data, indent=2)
+                else:
+                    text = json.dumps(data, separators=(",", ":"))
+                f.write(text.encode())
+            if durability == "fsync":
+                f.flush()
+                os.fsync(f.fileno())
+        if target is not path:
+            os.replace(target, path)
+    except Exception:
+        # Don't leave a half-written temp file behind
+        if target is not path:
+            try:
+                os.unlink(target)
+            except OSError:
+                pass
+        raise
+
+
+def _read_json(path):
+    """Read a JSON file, using orjson when installed."""
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+
+    import json
+
+    return json.loads(path.read_text())
+
 
 class WorkflowEngine:
     """Manages typed workflow pipelines with approval gates."""
 
-    def __init__(self, base_dir=None):
+    def __init__(self, base_dir=None, durability="rename"):
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(
+                f"Invalid durability: {durability!r} "
+                f"(expected one of {', '.join(DURABILITY_LEVELS)})"
+            )
+        self.durability = durability
         self.base_dir = Path(base_dir or os.getcwd()) / ".claude" / "workflows"
         self.definitions_dir = self.base_dir / "definitions"
         self.state_dir = Path(os.getcwd()) / ".claude" / "artifacts" / "workflow-state"
+        # (definitions_dir mtime_ns, workflow names) from the last listing
+        self._workflows_cache = None
+        # name -> ((mtime_ns, size) of the definition file, definition)
+        self._definition_cache = {}
 
     def load_workflow(self, name):
-        """Load a workflow definition by name."""
+        """Load a workflow definition by name.
+
+        Definitions are cached per name and reused while the definition
+        file's mtime and size are unchanged. The same dict is returned on
+        every hit, so callers must not mutate it.
+        """
+        cached = self._definition_cache.get(name)
+        if cached is not None:
+            key, definition = cached
+            try:
+                st = os.stat(definition["path"])
+            except OSError:
+                st = None
+            if st is not None and key == (st.st_mtime_ns, st.st_size):
+                return definition
+
         path = (self.definitions_dir / f"{name}.yaml").resolve()
         if not str(path).startswith(str(self.definitions_dir.resolve())):
             raise ValueError(f"Invalid workflow name: {name}")
@@ -31,7 +119,21 @@ class WorkflowEngine:
                 f"Available workflows: {self._list_workflows()}"
             )
         # Stub: return the raw YAML path for now
-        return {"name": name, "path": str(path)}
+        definition = {"name": name, "path": str(path)}
+        try:
+            st = path.stat()
+        except OSError:
+            return definition
+        self._definition_cache[name] = ((st.st_mtime_ns, st.st_size), definition)
+        return definition
+
+    def invalidate(self, name=None):
+        """Drop a cached workflow definition, or all of them if name is None."""
+        if name is None:
+            self._definition_cache.clear()
+            self._workflows_cache = None
+        else:
+            self._definition_cache.pop(name, None)
 
     def start(self, workflow, variables=None):
         """Start a workflow execution."""
@@ -43,7 +145,7 @@ class WorkflowEngine:
             "current_step": 0,
         }
         state_path = self.state_dir / f"{workflow['name']}.state.json"
-        state_path.write_text(json.dumps(state, indent=2))
+        _write_json(state_path, state, self.durability)
         return state
 
     def approve(self, workflow_id, approved_by=""):
@@ -51,14 +153,32 @@ class WorkflowEngine:
         approval_path = self.state_dir / f"{workflow_id}.approval.json"
         if not approval_path.exists():
             raise FileNotFoundError(f"No pending approval for workflow '{workflow_id}'")
-        approval = json.loads(approval_path.read_text())
+        approval = _read_json(approval_path)
         approval["status"] = "approved"
         approval["approved_by"] = approved_by
-        approval_path.write_text(json.dumps(approval, indent=2))
+        _write_json(approval_path, approval, self.durability)
         return approval
 
     def _list_workflows(self):
-        """List available workflow definitions."""
-        if not self.definitions_dir.exists():
+        """List available workflow definitions.
+
+        The listing is cached until the definitions directory's mtime
+        changes, which happens whenever a file is added or removed.
+        """
+        try:
+            mtime_ns = self.definitions_dir.stat().st_mtime_ns
+        except OSError:
+            return []
+        if self._workflows_cache and self._workflows_cache[0] == mtime_ns:
+            return self._workflows_cache[1]
+        try:
+            with os.scandir(self.definitions_dir) as entries:
+                workflows = [
+                    entry.name[:-5]
+                    for entry in entries
+                    if entry.name.endswith(".yaml") and entry.is_file()
+                ]
+        except OSError:
             return []
-        return [p.stem for p in self.definitions_dir.glob("*.yaml")]
+        self._workflows_cache = (mtime_ns, workflows)
+        return workflows
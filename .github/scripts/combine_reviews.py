@@ -14,34 +14,74 @@ Environment variables:
   GITHUB_OUTPUT      - Path to GitHub Actions output file
 """
 
+import bisect
 import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Presentation tables for build_markdown
+_DECISION_EMOJI = {"APPROVE": "\u2705", "REQUEST_CHANGES": "\U0001f534"}
+_SEVERITY_GROUPS = (
+    ("Critical", "critical", "\U0001f534"),
+    ("Important", "important", "\U0001f7e1"),
+    ("Suggestions", "suggestion", "\U0001f7e2"),
+)
+_SOURCE_LABELS = {"gemini": "\U0001f535 Gemini", "codex": "\U0001f7e0 Codex"}
+
+# Lower is more severe; unknown severities rank below all of these
+_SEVERITY_RANK = {"critical": 0, "important": 1, "suggestion": 2}
 
 
 def load_review(raw, has_result):
     if has_result != "true" or not raw.strip():
         return None
     try:
-        return json.loads(raw)
-    except json.JSONDecodeError as e:
+        return orjson.loads(raw) if orjson is not None else json.loads(raw)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
         print(f"Warning: failed to parse review JSON: {e}", file=sys.stderr)
         return None
 
 
+def _json_text(obj):
+    """Serialize obj as 2-space indented JSON, keeping non-ASCII as-is.
+
+    Uses orjson when installed; the stdlib fallback produces the same text.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+
 def collect_issues(gemini, codex):
     issues = []
-    if gemini and gemini.get("issues"):
-        for i in gemini["issues"]:
-            i.setdefault("source", "gemini")
-            issues.append(i)
-    if codex and codex.get("issues"):
-        for i in codex["issues"]:
-            i.setdefault("source", "codex")
-            issues.append(i)
+    for review, source in ((gemini, "gemini"), (codex, "codex")):
+        if review and review.get("issues"):
+            for i in review["issues"]:
+                i.setdefault("source", source)
+                _intern_fields(i)
+                issues.append(i)
     return issues
 
 
+def _intern_fields(issue):
+    """Intern the few distinct values repeated across many issues.
+
+    Parsed JSON gives every issue its own copy of "critical", "gemini" and
+    so on; interning shares one object per value and makes the lookups
+    keyed on them compare by identity first.
+    """
+    for key in ("severity", "source"):
+        value = issue.get(key)
+        if type(value) is str:
+            issue[key] = sys.intern(value)
+
+
 def _to_int(val):
     """Safely convert a value to int, returning None on failure."""
     if val is None:
@@ -52,138 +92,233 @@ def _to_int(val):
         return None
 
 
+def _match_key(issue):
+    """Return the (title words, line) pair consensus matching compares."""
+    return (
+        frozenset(map(sys.intern, issue.get("title", "").lower().split())),
+        _to_int(issue.get("line") or issue.get("line_start")),
+    )
+
+
 def detect_consensus(all_issues):
+    """Pair Gemini and Codex issues on the same file that look alike.
+
+    Two issues match when their titles share at least two words or their
+    lines are within 3 of each other. Codex issues are indexed by title word
+    and by line per file, so each Gemini issue only checks candidates that
+    can actually match instead of every Codex issue on the file.
+    """
     gemini_files = {}
     codex_files = {}
     for i in all_issues:
-        key = i.get("file", "").lower()
-        if i.get("source") == "gemini":
-            gemini_files.setdefault(key, []).append(i)
-        else:
-            codex_files.setdefault(key, []).append(i)
+        files = gemini_files if i.get("source") == "gemini" else codex_files
+        files.setdefault(i.get("file", "").lower(), []).append(i)
+
+    # Nothing can match when one model reported no issues
+    if not gemini_files or not codex_files:
+        return []
 
     consensus = []
-    for f in set(gemini_files.keys()) & set(codex_files.keys()):
-        for gi in gemini_files[f]:
-            for ci in codex_files[f]:
-                gt = gi.get("title", "").lower()
-                ct = ci.get("title", "").lower()
-                g_words = set(gt.split())
-                c_words = set(ct.split())
-                overlap = len(g_words & c_words)
-                g_line = _to_int(gi.get("line") or gi.get("line_start"))
-                c_line = _to_int(ci.get("line") or ci.get("line_start"))
-                lines_close = (
-                    g_line is not None
-                    and c_line is not None
-                    and abs(g_line - c_line) <= 3
-                )
-                if overlap >= 2 or lines_close:
-                    gi["_consensus"] = True
-                    ci["_consensus"] = True
-                    consensus.append({"file": f, "gemini": gi, "codex": ci})
+    for f, g_issues in gemini_files.items():
+        c_issues = codex_files.get(f)
+        if not c_issues:
+            continue
+
+        # Title words and line are computed once per issue, not per pair
+        c_keys = [_match_key(ci) for ci in c_issues]
+        by_word = {}
+        by_line = []
+        for idx, (c_words, c_line) in enumerate(c_keys):
+            for w in c_words:
+                by_word.setdefault(w, []).append(idx)
+            if c_line is not None:
+                by_line.append((c_line, idx))
+        by_line.sort()
+        line_keys = [line for line, _ in by_line]
+
+        for gi in g_issues:
+            g_words, g_line = _match_key(gi)
+            # A candidate matches as soon as it shares a second title word
+            hits = {}
+            matched = set()
+            for w in g_words:
+                for idx in by_word.get(w, ()):
+                    n = hits.get(idx, 0) + 1
+                    hits[idx] = n
+                    if n == 2:
+                        matched.add(idx)
+            if g_line is not None:
+                lo = bisect.bisect_left(line_keys, g_line - 3)
+                hi = bisect.bisect_right(line_keys, g_line + 3)
+                matched.update(idx for _, idx in by_line[lo:hi])
+
+            for idx in sorted(matched):
+                ci = c_issues[idx]
+                gi["_consensus"] = True
+                ci["_consensus"] = True
+                consensus.append({"file": f, "gemini": gi, "codex": ci})
 
     return consensus
 
 
-def determine_decision(gemini, codex):
-    decisions = []
-    if gemini:
-        decisions.append(gemini.get("decision", "COMMENT"))
-    if codex:
-        decisions.append(codex.get("decision", "COMMENT"))
+def _duplicate_key(issue):
+    """Return the (file, normalized title, line) an exact duplicate shares."""
+    return (
+        issue.get("file"),
+        " ".join((issue.get("title") or "").lower().split()),
+        _to_int(issue.get("line") or issue.get("line_start")),
+    )
+
+
+def merge_consensus(all_issues, consensus):
+    """Fold exact-duplicate Codex issues into the Gemini issue they repeat.
+
+    Returns the issues left to report. Only consensus pairs on the same file,
+    with the same normalized title and the same line are merged, and each
+    issue takes part in at most one merge; every other Codex issue is kept
+    as is. The Gemini issue keeps its own text, takes the more severe of the
+    two severities, and records the Codex source plus its description and
+    suggestion (where they differ) under _alt_source, _alt_description and
+    _alt_suggestion.
+    """
+    merged = set()
+    duplicates = set()
+    for c in consensus:
+        gi, ci = c["gemini"], c["codex"]
+        if id(gi) in merged or id(ci) in duplicates:
+            continue
+        if _duplicate_key(gi) != _duplicate_key(ci):
+            continue
+        merged.add(id(gi))
+        duplicates.add(id(ci))
+
+        if _SEVERITY_RANK.get(ci.get("severity"), 3) < _SEVERITY_RANK.get(
+            gi.get("severity"), 3
+        ):
+            gi["severity"] = ci["severity"]
+        gi["_alt_source"] = ci.get("source")
+        c_desc = ci.get("description") or ci.get("body", "")
+        if c_desc and c_desc != (gi.get("description") or gi.get("body", "")):
+            gi["_alt_description"] = c_desc
+        if ci.get("suggestion") and ci["suggestion"] != gi.get("suggestion"):
+            gi["_alt_suggestion"] = ci["suggestion"]
+
+    if not duplicates:
+        return all_issues
+    return [i for i in all_issues if id(i) not in duplicates]
 
-    if "REQUEST_CHANGES" in decisions:
-        return "REQUEST_CHANGES"
-    if all(d == "APPROVE" for d in decisions) and decisions:
+
+def determine_decision(gemini, codex):
+    any_decision = False
+    all_approve = True
+    for review in (gemini, codex):
+        if not review:
+            continue
+        decision = review.get("decision", "COMMENT")
+        if decision == "REQUEST_CHANGES":
+            return "REQUEST_CHANGES"
+        any_decision = True
+        if decision != "APPROVE":
+            all_approve = False
+
+    if any_decision and all_approve:
         return "APPROVE"
     return "COMMENT"
 
 
-def build_markdown(gemini, codex, all_issues, consensus, decision, pr_number):
-    md = []
+def build_markdown(out, gemini, codex, all_issues, consensus, decision, pr_number):
+    """Write the combined review comment to the file object out.
+
+    Lines are written as _iter_markdown produces them rather than collected
+    and joined, so the comment is never held in memory as a whole.
+    """
+    for line in _iter_markdown(
+        gemini, codex, all_issues, consensus, decision, pr_number
+    ):
+        out.write(line)
+        out.write("\n")
 
-    decision_emoji = {"APPROVE": "\u2705", "REQUEST_CHANGES": "\U0001f534"}.get(
-        decision, "\U0001f4ac"
-    )
-    md.append(f"## {decision_emoji} Combined AI PR Review\n")
+
+def _iter_markdown(gemini, codex, all_issues, consensus, decision, pr_number):
+    """Yield the lines of the combined review comment."""
+    decision_emoji = _DECISION_EMOJI.get(decision, "\U0001f4ac")
+    yield f"## {decision_emoji} Combined AI PR Review\n"
 
     models_used = []
     if gemini:
         models_used.append("Gemini")
     if codex:
         models_used.append("Codex")
-    md.append(f"**Models:** {' + '.join(models_used)}")
-    md.append(f"**Combined Decision:** {decision}\n")
+    yield f"**Models:** {' + '.join(models_used)}"
+    yield f"**Combined Decision:** {decision}\n"
 
     if gemini and gemini.get("summary"):
-        md.append(f"**Gemini Summary:** {gemini['summary']}")
+        yield f"**Gemini Summary:** {gemini['summary']}"
     if codex and codex.get("summary"):
-        md.append(f"**Codex Summary:** {codex['summary']}")
-    md.append("")
+        yield f"**Codex Summary:** {codex['summary']}"
+    yield ""
 
     if consensus:
-        md.append("### \U0001f91d Consensus Issues (flagged by both models)\n")
-        md.append(
+        yield "### \U0001f91d Consensus Issues (flagged by both models)\n"
+        yield (
             "These issues were independently identified by both Gemini and Codex, "
             "indicating higher confidence:\n"
         )
         for c in consensus:
             gi = c["gemini"]
-            md.append(
-                f"- **`{gi.get('file')}`**: {gi.get('title')} _(both models agree)_"
-            )
-        md.append("")
+            yield f"- **`{gi.get('file')}`**: {gi.get('title')} _(both models agree)_"
+        yield ""
 
     if all_issues:
-        severity_groups = [
-            ("Critical", "critical", "\U0001f534"),
-            ("Important", "important", "\U0001f7e1"),
-            ("Suggestions", "suggestion", "\U0001f7e2"),
-        ]
-
-        for label, sev, icon in severity_groups:
-            group = [i for i in all_issues if i.get("severity") == sev]
+        # Bucket issues by severity in one pass; unknown severities are
+        # only listed in the JSON block
+        by_severity = {sev: [] for _, sev, _ in _SEVERITY_GROUPS}
+        for i in all_issues:
+            group = by_severity.get(i.get("severity"))
+            if group is not None:
+                group.append(i)
+
+        for label, sev, icon in _SEVERITY_GROUPS:
+            group = by_severity[sev]
             if not group:
                 continue
-            md.append(f"### {icon} {label}\n")
+            yield f"### {icon} {label}\n"
             for i in group:
-                src = {
-                    "gemini": "\U0001f535 Gemini",
-                    "codex": "\U0001f7e0 Codex",
-                }.get(i.get("source"), "\u2753")
+                src = _SOURCE_LABELS.get(i.get("source"), "\u2753")
+                if "_alt_source" in i:
+                    src += " + " + _SOURCE_LABELS.get(i["_alt_source"], "\u2753")
                 badge = " \U0001f91d" if i.get("_consensus") else ""
 
-                md.append(f"#### #{i['id']}: {i.get('title', 'Untitled')}{badge}")
-                md.append(f"- **Source:** {src}")
-                md.append(f"- **File:** `{i.get('file', '?')}`")
+                yield f"#### #{i['id']}: {i.get('title', 'Untitled')}{badge}"
+                yield f"- **Source:** {src}"
+                yield f"- **File:** `{i.get('file', '?')}`"
                 line = i.get("line") or i.get("line_start")
                 if line:
-                    md.append(f"- **Line:** {line}")
+                    yield f"- **Line:** {line}"
                 desc = i.get("description") or i.get("body", "")
                 if desc:
-                    md.append(f"- **Details:** {desc}")
+                    yield f"- **Details:** {desc}"
+                if i.get("_alt_description"):
+                    yield f"- **Also noted:** {i['_alt_description']}"
                 if i.get("suggestion"):
-                    md.append(f"> \U0001f4a1 {i['suggestion']}")
-                md.append("")
-
-        md.append(
-            "<details><summary>\U0001f4cb JSON (for selective acceptance)</summary>\n"
-        )
-        md.append("```json")
-        md.append(json.dumps({"issues": all_issues}, indent=2))
-        md.append("```\n</details>\n")
-        md.append("---\n")
-        md.append("### \U0001f504 Implement with Claude Code\n")
-        md.append("Reply to this comment with instructions:\n")
-        md.append("- `Accept all` - implement everything as suggested")
-        md.append("- `Ignore #2, fix the rest` - selective implementation")
-        md.append("- Or any natural language instructions\n")
-        md.append(f"<!-- claude-code-prompt:{pr_number} -->")
+                    yield f"> \U0001f4a1 {i['suggestion']}"
+                if i.get("_alt_suggestion"):
+                    yield f"> \U0001f4a1 {i['_alt_suggestion']}"
+                yield ""
+
+        yield "<details><summary>\U0001f4cb JSON (for selective acceptance)</summary>\n"
+        yield "```json"
+        yield _json_text({"issues": all_issues})
+        yield "```\n</details>\n"
+        yield "---\n"
+        yield "### \U0001f504 Implement with Claude Code\n"
+        yield "Reply to this comment with instructions:\n"
+        yield "- `Accept all` - implement everything as suggested"
+        yield "- `Ignore #2, fix the rest` - selective implementation"
+        yield "- Or any natural language instructions\n"
+        yield f"<!-- claude-code-prompt:{pr_number} -->"
     else:
-        md.append("\nNo issues found by either model. The changes look good!\n")
-
-    return "\n".join(md)
+        yield "\nNo issues found by either model. The changes look good!\n"
 
 
 def build_instructions(decision, all_issues):
@@ -193,7 +328,7 @@ def build_instructions(decision, all_issues):
         "> Generated by Combined AI Review (Gemini + Codex)",
         "",
         "```json",
-        json.dumps({"decision": decision, "issues": all_issues}, indent=2),
+        _json_text({"decision": decision, "issues": all_issues}),
         "```",
     ]
     return "\n".join(lines)
@@ -202,12 +337,14 @@ def build_instructions(decision, all_issues):
 def read_json_input(file_env, fallback_env):
     """Read JSON from a file (preferred) or env var (fallback).
 
-    Using files avoids env var size limits on large PRs.
+    Using files avoids env var size limits on large PRs. File content is
+    returned as raw bytes and decoded only by the JSON parser; the env var
+    fallback is returned as str.
     """
     file_path = os.environ.get(file_env, "")
     if file_path:
         try:
-            with open(file_path) as f:
+            with open(file_path, "rb") as f:
                 content = f.read().strip()
                 if content:
                     return content
@@ -216,18 +353,36 @@ def read_json_input(file_env, fallback_env):
     return os.environ.get(fallback_env, "{}")
 
 
-def main():
-    gemini_raw = read_json_input("GEMINI_JSON_FILE", "GEMINI_JSON")
-    codex_raw = read_json_input("CODEX_JSON_FILE", "CODEX_JSON")
-    gemini_ok = os.environ.get("GEMINI_HAS_RESULT", "false")
-    codex_ok = os.environ.get("CODEX_HAS_RESULT", "false")
-    pr_number = os.environ.get("PR_NUMBER", "0")
+def _load_input(file_env, fallback_env, has_result):
+    """Read and parse one model's review, skipping the read without a result."""
+    if has_result != "true":
+        return None
+    return load_review(read_json_input(file_env, fallback_env), has_result)
+
 
-    gemini = load_review(gemini_raw, gemini_ok)
-    codex = load_review(codex_raw, codex_ok)
+def main():
+    env = os.environ
+    gemini_ok = env.get("GEMINI_HAS_RESULT", "false")
+    codex_ok = env.get("CODEX_HAS_RESULT", "false")
+    pr_number = env.get("PR_NUMBER", "0")
+    gh_output = env.get("GITHUB_OUTPUT")
+
+    gemini_args = ("GEMINI_JSON_FILE", "GEMINI_JSON", gemini_ok)
+    codex_args = ("CODEX_JSON_FILE", "CODEX_JSON", codex_ok)
+    if env.get("GEMINI_JSON_FILE") and env.get("CODEX_JSON_FILE"):
+        # Both reviews come from files: read and parse them concurrently,
+        # Codex on the main thread
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            gemini_future = executor.submit(_load_input, *gemini_args)
+            codex = _load_input(*codex_args)
+            gemini = gemini_future.result()
+    else:
+        gemini = _load_input(*gemini_args)
+        codex = _load_input(*codex_args)
 
     all_issues = collect_issues(gemini, codex)
     consensus = detect_consensus(all_issues)
+    all_issues = merge_consensus(all_issues, consensus)
     decision = determine_decision(gemini, codex)
 
     # Re-number issues sequentially
@@ -235,9 +390,8 @@ def main():
         i["id"] = idx
 
     # Write comment markdown
-    comment = build_markdown(gemini, codex, all_issues, consensus, decision, pr_number)
-    with open("/tmp/combined-comment.md", "w") as f:
-        f.write(comment)
+    with open("/tmp/combined-comment.md", "w", buffering=1 << 16) as f:
+        build_markdown(f, gemini, codex, all_issues, consensus, decision, pr_number)
 
     # Write REVIEW_INSTRUCTIONS.md if issues found
     has_feedback = len(all_issues) > 0
@@ -247,14 +401,13 @@ def main():
             f.write(instructions)
 
     # Write GitHub Actions outputs
-    gh_output = os.environ.get("GITHUB_OUTPUT")
     if gh_output:
         with open(gh_output, "a") as f:
-            f.write(f"has_feedback={str(has_feedback).lower()}\n")
-            f.write(f"decision={decision}\n")
+            f.write(f"has_feedback={str(has_feedback).lower()}\ndecision={decision}\n")
 
-    print(
-        f"Combined review: decision={decision}, issues={len(all_issues)}, consensus={len(consensus)}"
+    sys.stdout.write(
+        f"Combined review: decision={decision}, issues={len(all_issues)}, "
+        f"consensus={len(consensus)}\n"
     )
 
 